@@ -1,10 +1,132 @@
 # bdd.py
-from dd.autoref import BDD
+try:
+    # CUDD-backed manager: C apply cache and native dynamic reordering
+    from dd.cudd import BDD, and_exists
+    HAS_CUDD = True
+except ImportError:
+    from dd.autoref import BDD, image
+    HAS_CUDD = False
 import time
-from typing import Tuple, Any
+from collections import deque
+from functools import lru_cache
+from typing import Tuple, Any, Callable, Dict, List, Set
 from pnml_parser import PetriNet
 
 
+def _image(bdd: BDD, trans: Any, source: Any, qvars: Set[str], rename: Dict[str, str]) -> Any:
+    """
+    Relational product (∃qvars. source ∧ trans)[rename], without building
+    the conjunction separately: CUDD's and_exists on dd.cudd, dd's fused
+    image operator on dd.autoref. A transition with no input or output
+    places has nothing to quantify or rename.
+    """
+    if not qvars and not rename:
+        return source & trans
+    if HAS_CUDD:
+        return bdd.let(rename, and_exists(source, trans, qvars))
+    return image(trans, source, rename, qvars)
+
+
+@lru_cache(maxsize=32)
+def _relation_builder(shape: Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]) -> Callable:
+    """
+    Compile a function returning the relation T_t of every transition for
+    nets of the given shape: (pre, post) variable indices per transition.
+    All literals are hard-coded, so each T_t is one straight-line
+    conjunction, and the compiled function is reused across calls on nets
+    with the same shape.
+    """
+    rows = []
+    for pre_idx, post_idx in shape:
+        only_pre = sorted(set(pre_idx) - set(post_idx))
+        # Guard: all pre-places marked. Next state: produced (or consumed
+        # and produced) → 1, only consumed → 0
+        literals = ([f"xn[{i}]" for i in pre_idx]
+                    + [f"yn[{i}]" for i in post_idx]
+                    + [f"nyn[{i}]" for i in only_pre])
+        rows.append("        " + (" & ".join(literals) or "true") + ",")
+    src = "\n".join(["def build(true, xn, yn, nyn):", "    return [", *rows, "    ]"])
+    namespace: Dict[str, Any] = {}
+    exec(compile(src, "<relation-builder>", "exec"), namespace)
+    return namespace["build"]
+
+
+def _place_order(petri_net: PetriNet) -> List[str]:
+    """
+    Order places so that places sharing a transition get nearby BDD levels.
+    Greedy Cuthill-McKee over the place co-occurrence graph: each component
+    is traversed breadth-first from a lowest-degree place, visiting
+    neighbours by increasing degree (ties broken by name).
+    """
+    neighbours: Dict[str, Set[str]] = {p: set() for p in petri_net.places}
+    for t in petri_net.transitions:
+        support = petri_net.preset[t] | petri_net.postset[t]
+        for p in support:
+            neighbours[p] |= support
+    for p in neighbours:
+        neighbours[p].discard(p)
+
+    def key(p):
+        return (len(neighbours[p]), p)
+
+    order = []
+    seen = set()
+    for start in sorted(petri_net.places, key=key):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = deque([start])
+        while queue:
+            p = queue.popleft()
+            order.append(p)
+            for q in sorted(neighbours[p] - seen, key=key):
+                seen.add(q)
+                queue.append(q)
+    return order
+
+
+def _count_markings(bdd: BDD, u: Any, x_vars: List[str]) -> int:
+    """
+    Exact number of assignments to x_vars satisfying u, as a Python int.
+    bdd.count returns a float on dd.cudd, which is inexact past 2^53 and
+    overflows past ~2^1024. Iterative memoised walk over u's nodes;
+    complemented edges count as the complement over the remaining levels.
+    """
+    order = sorted(x_vars, key=bdd.level_of_var)
+    rank = {v: i for i, v in enumerate(order)}
+    n = len(order)
+
+    def rank_of(f):
+        return n if f.var is None else rank[f.var]
+
+    memo: Dict[Any, int] = {}
+    stack = [u]
+    while stack:
+        f = stack[-1]
+        if f in memo:
+            stack.pop()
+        elif f.var is None:
+            memo[f] = 1 if f == bdd.true else 0
+            stack.pop()
+        elif f.negated:
+            g = ~f
+            if g in memo:
+                memo[f] = (1 << (n - rank_of(f))) - memo[g]
+                stack.pop()
+            else:
+                stack.append(g)
+        else:
+            lo, hi = f.low, f.high
+            pending = [c for c in (lo, hi) if c not in memo]
+            if pending:
+                stack.extend(pending)
+                continue
+            r = rank_of(f)
+            memo[f] = (memo[lo] << (rank_of(lo) - r - 1)) + (memo[hi] << (rank_of(hi) - r - 1))
+            stack.pop()
+    return memo[u] << rank_of(u)
+
+
 def symbolic_reachability_bdd(petri_net: PetriNet) -> Tuple[Any, int, float, BDD]:
     """
     Symbolic reachability via fixpoint iteration using BDDs.
@@ -15,90 +137,71 @@ def symbolic_reachability_bdd(petri_net: PetriNet) -> Tuple[Any, int, float, BDD
         return bdd.false, 0, 0.0, bdd
 
     start_time = time.perf_counter()
-    places = sorted(petri_net.places)
+    places = _place_order(petri_net)
     n = len(places)
 
     # Initialize BDD manager
     bdd = BDD()
-    
-    # Declare current (x_i) and next (y_i) variables
+    if HAS_CUDD:
+        # Let CUDD sift variables while the fixpoint grows
+        bdd.configure(reordering=True)
+
+    # Declare current (x_i) and next (y_i) variables interleaved, so each
+    # x_i sits right next to its y_i in the variable order
     x_vars = [f"x_{i}" for i in range(n)]
     y_vars = [f"y_{i}" for i in range(n)]
-    bdd.declare(*x_vars, *y_vars)
+    bdd.declare(*(v for pair in zip(x_vars, y_vars) for v in pair))
 
     # Map place name to variable index
     place_to_idx = {p: i for i, p in enumerate(places)}
-    
-    # Encode initial marking: R0 = ∧ (x_i = 1 if marked else 0)
-    init_terms = []
-    for p in places:
-        i = place_to_idx[p]
-        if p in petri_net.initial_marking:
-            init_terms.append(x_vars[i])
-        else:
-            init_terms.append(f"~{x_vars[i]}")
-    R = bdd.add_expr(" & ".join(init_terms)) if init_terms else bdd.true
-
-    # Build global transition relation T(X, Y) = ∨_t T_t(X, Y)
-    T_global = bdd.false
-
-    for t in petri_net.transitions:
-        pre = petri_net.preset[t]
-        post = petri_net.postset[t]
-
-        # Guard: all pre-places must be marked
-        if pre:
-            guard = " & ".join(x_vars[place_to_idx[p]] for p in pre)
-        else:
-            guard = "True"
-
-        # Next-state constraints — FIXED LOGIC
-        next_constraints = []
-        for p in places:
-            i = place_to_idx[p]
-            x = x_vars[i]
-            y = y_vars[i]
-            in_pre = p in pre
-            in_post = p in post
-
-            if in_pre and in_post:
-                # Net effect: token consumed and produced → unchanged
-                next_constraints.append(f"({x} <-> {y})")
-            elif in_pre:
-                # Only consumed → must be 0 in next state
-                next_constraints.append(f"~{y}")
-            elif in_post:
-                # Only produced → must be 1 in next state
-                next_constraints.append(y)
-            else:
-                # Unchanged
-                next_constraints.append(f"({x} <-> {y})")
-
-        body = " & ".join(next_constraints)
-        T_t_expr = f"({guard}) & ({body})" if guard != "True" else body
-        T_t = bdd.add_expr(T_t_expr)
-        
-        # Accumulate: T_global = T_global OR T_t
-        T_global = bdd.apply("or", T_global, T_t)
-
-    # Fixpoint iteration: R = R ∪ Image(R)
-    rename_map = {y_vars[i]: x_vars[i] for i in range(n)}
-    current_var_names = x_vars  # for existential quantification
 
+    # Variable node handles and negated next-state literals, looked up once
+    # and reused for every relation
+    x_nodes = [bdd.var(v) for v in x_vars]
+    y_nodes = [bdd.var(v) for v in y_vars]
+    not_y_nodes = [~v for v in y_nodes]
+
+    # Encode initial marking: R0 = ∧ (x_i = 1 if marked else 0), built as a
+    # single cube
+    R = bdd.cube({x_vars[i]: p in petri_net.initial_marking for i, p in enumerate(places)})
+
+    # Build the transition relation as a disjunctive partition T = ∨_t T_t,
+    # each T_t constraining only the places in pre(t) ∪ post(t). Places
+    # outside that support keep their x_i during the image (frame-only
+    # encoding), so no (x_i <-> y_i) frame axioms are needed.
+    # The relations come from a builder generated for the net's shape.
+    shape = tuple(
+        (tuple(sorted(place_to_idx[p] for p in petri_net.preset[t])),
+         tuple(sorted(place_to_idx[p] for p in petri_net.postset[t])))
+        for t in sorted(petri_net.transitions)
+    )
+    relations = _relation_builder(shape)(bdd.true, x_nodes, y_nodes, not_y_nodes)
+
+    T_list = []
+    for (pre_idx, post_idx), T_t in zip(shape, relations):
+        support = set(pre_idx) | set(post_idx)
+        qvars = {x_vars[i] for i in support}
+        rename = {y_vars[i]: x_vars[i] for i in support}
+        T_list.append((T_t, qvars, rename))
+
+    # Fixpoint iteration as symbolic BFS: only the frontier (states first
+    # reached in the previous step) is imaged, not the whole of R
+    frontier = R
     while True:
-        # Image = ∃X. (R ∧ T)
-        image = bdd.apply("and", R, T_global)
-        image = bdd.exist(current_var_names, image)
-        image = bdd.let(rename_map, image)
+        # Image = ∨_t (∃X_t. frontier ∧ T_t)[Y_t := X_t]
+        img = bdd.false
+        for T_t, qvars, rename in T_list:
+            img |= _image(bdd, T_t, frontier, qvars, rename)
 
         # New = image \ R
-        not_R = bdd.apply("not", R)
-        new_states = bdd.apply("and", image, not_R)
-        if new_states == bdd.false:
+        frontier = img & ~R
+        if frontier == bdd.false:
             break
 
-        R = bdd.apply("or", R, new_states)
+        R |= frontier
 
     elapsed = time.perf_counter() - start_time
-    count = bdd.count(R)
+    # Count over all n place variables: a place that ends up unconstrained
+    # in R drops out of its support but still doubles the number of markings.
+    count = _count_markings(bdd, R, x_vars)
     return R, count, elapsed, bdd
\ No newline at end of file
@@ -0,0 +1,72 @@
+# bfs_numba.py
+# Optional Numba-compiled kernel for the explicit BFS in PetriNet.
+# Markings are int64 bitsets, so only nets with at most MAX_PLACES places are
+# handled here; callers fall back to the pure-Python BFS otherwise, or when
+# Numba is not installed. NumPy and Numba are imported on first use, so
+# importing this module (and pnml_parser) stays cheap.
+from functools import lru_cache
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+# Bit 63 is the int64 sign bit; keep masks non-negative
+MAX_PLACES = 63
+
+
+@lru_cache(maxsize=None)
+def _kernel() -> Optional[Tuple[Any, Callable]]:
+    # (numpy, compiled BFS), or None when Numba is not installed
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError:
+        return None
+
+    @njit(cache=True)
+    def _bfs(initial, pre_masks, post_masks):
+        # `order` doubles as the BFS queue: markings are appended in
+        # discovery order and consumed from `head`
+        order = [initial]
+        visited = {initial}
+        head = 0
+        while head < len(order):
+            m = order[head]
+            head += 1
+            for i in range(pre_masks.size):
+                pre = pre_masks[i]
+                if m & pre == pre:
+                    next_m = (m & ~pre) | post_masks[i]
+                    if next_m not in visited:
+                        visited.add(next_m)
+                        order.append(next_m)
+        return np.array(order, dtype=np.int64)
+
+    return np, _bfs
+
+
+def bfs_reachable_masks(initial: int, masks: Sequence[Tuple[int, int]],
+                        n_places: int) -> Optional[List[int]]:
+    """
+    Reachable markings (as int bitsets, in BFS order) from `initial`, given
+    (pre_mask, post_mask) per transition in firing order.
+    Returns None when the kernel cannot be used for this net.
+    """
+    if n_places > MAX_PLACES:
+        return None
+    kernel = _kernel()
+    if kernel is None:
+        return None
+    np, bfs = kernel
+    pre_masks = np.array([pre for pre, _ in masks], dtype=np.int64)
+    post_masks = np.array([post for _, post in masks], dtype=np.int64)
+    return bfs(np.int64(initial), pre_masks, post_masks).tolist()
+
+
+def warm_up() -> None:
+    """
+    Compile the kernel (or load it from Numba's cache) ahead of time, so
+    that a timed BFS does not include JIT latency.
+    """
+    kernel = _kernel()
+    if kernel is not None:
+        np, bfs = kernel
+        masks = np.zeros(1, dtype=np.int64)
+        bfs(np.int64(0), masks, masks)
@@ -0,0 +1,75 @@
+# drawing.py
+# Rendering of Petri nets and reachability graphs (matplotlib + networkx)
+
+
+def _layout(G):
+    # Graphviz "dot" when pygraphviz is installed, spring layout otherwise
+    import networkx as nx
+
+    try:
+        return nx.nx_agraph.graphviz_layout(G, prog="dot")
+    except:
+        return nx.spring_layout(G, seed=42)
+
+
+def _savefig(plt, output_file, dpi):
+    # Vector output has no raster resolution; PNGs are rasterised at `dpi`
+    if output_file.lower().endswith(".svg"):
+        plt.savefig(output_file)
+    else:
+        plt.savefig(output_file, dpi=dpi)
+
+
+def draw_petri_net(petri_net, output_file="petri_net.png", dpi=100):
+    # Plotting libraries are heavy to import; load them only when drawing
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
+    G = nx.DiGraph()
+    for p in petri_net.places:
+        G.add_node(p, type="place")
+    for t in petri_net.transitions:
+        G.add_node(t, type="transition")
+    for s, tgt in petri_net.arcs:
+        G.add_edge(s, tgt)
+
+    pos = _layout(G)
+
+    plt.figure(figsize=(10, 8))
+    place_nodes = [n for n in G.nodes if G.nodes[n]["type"] == "place"]
+    nx.draw_networkx_nodes(G, pos, nodelist=place_nodes, node_shape='o', node_color='lightblue', node_size=400)
+    transition_nodes = [n for n in G.nodes if G.nodes[n]["type"] == "transition"]
+    nx.draw_networkx_nodes(G, pos, nodelist=transition_nodes, node_shape='s', node_color='lightgreen', node_size=400)
+    nx.draw_networkx_edges(G, pos, arrows=True, arrowstyle='-|>', arrowsize=20)
+    nx.draw_networkx_labels(G, pos, font_size=10, font_weight="bold")
+    plt.axis("off")
+    plt.title(f"Petri Net: {petri_net.name}")
+    plt.tight_layout()
+    _savefig(plt, output_file, dpi)
+    plt.close()
+
+
+def draw_reachability_graph(labels, edges, output_file="reachability_graph.png", dpi=100):
+    # Pure plotting: labels[i] names state S{i}, edges are the (i, t, j)
+    # triples from PetriNet.get_reachability_edges()
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
+    G = nx.DiGraph()
+    G.add_nodes_from((f"S{i}", {"label": label}) for i, label in enumerate(labels))
+    G.add_edges_from((f"S{i}", f"S{j}", {"transition": t}) for i, t, j in edges)
+
+    pos = _layout(G)
+
+    plt.figure(figsize=(12, 10))
+    nx.draw_networkx_nodes(G, pos, node_color='lightyellow', node_size=400)
+    nx.draw_networkx_edges(G, pos, arrows=True, arrowstyle='-|>', arrowsize=20)
+    node_labels = {n: G.nodes[n]["label"] for n in G.nodes}
+    nx.draw_networkx_labels(G, pos, node_labels, font_size=9)
+    edge_labels = {(u, v): G.edges[(u, v)]["transition"] for u, v in G.edges}
+    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_color="red")
+    plt.axis("off")
+    plt.title("Reachability Graph")
+    plt.tight_layout()
+    _savefig(plt, output_file, dpi)
+    plt.close()
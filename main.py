@@ -1,71 +1,13 @@
 # main.py
 
+import argparse
 import sys
 import time
+from multiprocessing import Process
 from pnml_parser import parse_pnml
 from bdd import symbolic_reachability_bdd
-import matplotlib.pyplot as plt
-import networkx as nx
-
-
-def draw_petri_net(petri_net, output_file="petri_net.png"):
-    G = nx.DiGraph()
-    for p in petri_net.places:
-        G.add_node(p, type="place")
-    for t in petri_net.transitions:
-        G.add_node(t, type="transition")
-    for s, tgt in petri_net.arcs:
-        G.add_edge(s, tgt)
-
-    try:
-        pos = nx.nx_agraph.graphviz_layout(G, prog="dot")
-    except:
-        pos = nx.spring_layout(G, seed=42)
-
-    plt.figure(figsize=(10, 8))
-    place_nodes = [n for n in G.nodes if G.nodes[n]["type"] == "place"]
-    nx.draw_networkx_nodes(G, pos, nodelist=place_nodes, node_shape='o', node_color='lightblue', node_size=400)
-    transition_nodes = [n for n in G.nodes if G.nodes[n]["type"] == "transition"]
-    nx.draw_networkx_nodes(G, pos, nodelist=transition_nodes, node_shape='s', node_color='lightgreen', node_size=400)
-    nx.draw_networkx_edges(G, pos, arrows=True, arrowstyle='-|>', arrowsize=20)
-    nx.draw_networkx_labels(G, pos, font_size=10, font_weight="bold")
-    plt.axis("off")
-    plt.title(f"Petri Net: {petri_net.name}")
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=300)
-    plt.close()
-
-
-def draw_reachability_graph(petri_net, output_file="reachability_graph.png"):
-    reachable = petri_net.get_reachable_markings()
-    G = nx.DiGraph()
-    state_id = {m: f"S{i}" for i, m in enumerate(reachable)}
-    for m in reachable:
-        label = "{" + ", ".join(sorted(m)) + "}" if m else "∅"
-        G.add_node(state_id[m], label=label)
-    for m in reachable:
-        for t in petri_net.transitions:
-            if petri_net.is_enabled(t, m):
-                next_m = petri_net.fire(t, m)
-                G.add_edge(state_id[m], state_id[next_m], transition=t)
-
-    try:
-        pos = nx.nx_agraph.graphviz_layout(G, prog="dot")
-    except:
-        pos = nx.spring_layout(G, seed=42)
-
-    plt.figure(figsize=(12, 10))
-    nx.draw_networkx_nodes(G, pos, node_color='lightyellow', node_size=400)
-    nx.draw_networkx_edges(G, pos, arrows=True, arrowstyle='-|>', arrowsize=20)
-    labels = {n: G.nodes[n]["label"] for n in G.nodes}
-    nx.draw_networkx_labels(G, pos, labels, font_size=9)
-    edge_labels = {(u, v): G.edges[(u, v)]["transition"] for u, v in G.edges}
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_color="red")
-    plt.axis("off")
-    plt.title("Reachability Graph")
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=300)
-    plt.close()
+from bfs_numba import warm_up
+from drawing import draw_petri_net, draw_reachability_graph
 
 
 def format_marking(m):
@@ -73,45 +15,66 @@ def format_marking(m):
 
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python main.py <input.pnml>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Explicit vs symbolic reachability of a PNML Petri net")
+    parser.add_argument("pnml", help="input .pnml file")
+    parser.add_argument("--draw", action=argparse.BooleanOptionalAction, default=False,
+                        help="render petri_net.png and reachability_graph.png (off by default)")
+    parser.add_argument("--cache", metavar="DIR",
+                        help="reuse reachable markings stored in DIR from earlier runs (off by default)")
+    args = parser.parse_args()
 
     try:
-        net = parse_pnml(sys.argv[1])
+        net = parse_pnml(args.pnml)
         print("✅ PNML parsing successful!")
         print(net)
+        net.cache_dir = args.cache
 
-        draw_petri_net(net, "petri_net.png")
-
-        # Explicit BFS
-        t0 = time.perf_counter()
+        # Explicit BFS; compile the JIT kernel first so it is not timed
+        warm_up()
+        t0 = time.perf_counter_ns()
         reachable_explicit = net.get_reachable_markings()
-        t1 = time.perf_counter()
+        t1 = time.perf_counter_ns()
         count_explicit = len(reachable_explicit)
-        time_explicit_us = (t1 - t0) * 1_000_000
+        time_explicit_us = (t1 - t0) // 1_000
 
-        print(f"\n🔍 Explicit BFS: {count_explicit} markings in {time_explicit_us:.0f} µs")
+        print(f"\n🔍 Explicit BFS: {count_explicit} markings in {time_explicit_us} µs")
         print("\n📋 Reachable markings in firing order (BFS):")
-        for i, m in enumerate(reachable_explicit, 1):
-            print(f"  {i:2d}: {format_marking(m)}")
+        # Format each marking once; the listing and the graph share the labels
+        labels = [format_marking(m) for m in reachable_explicit]
+        sys.stdout.write("".join(f"  {i:2d}: {label}\n" for i, label in enumerate(labels, 1)))
 
-        draw_reachability_graph(net, "reachability_graph.png")
+        deadlock = net.find_first_deadlock()
+        print("\n💀 First deadlock (BFS): " + (format_marking(deadlock) if deadlock is not None else "none"))
 
         # Symbolic BDD
-        t2 = time.perf_counter()
+        t2 = time.perf_counter_ns()
         Reach_bdd, count_bdd, time_bdd_sec, _ = symbolic_reachability_bdd(net)
-        t3 = time.perf_counter()
-        time_bdd_us = (t3 - t2) * 1_000_000
+        t3 = time.perf_counter_ns()
+        time_bdd_us = (t3 - t2) // 1_000
 
-        print(f"\n🧠 Symbolic BDD: {count_bdd} markings in {time_bdd_us:.0f} µs")
+        print(f"\n🧠 Symbolic BDD: {count_bdd} markings in {time_bdd_us} µs")
 
         # Comparison
         print(f"\n📊 Performance Comparison:")
-        print(f"  Explicit: {count_explicit:>2} states, {time_explicit_us:>8.0f} µs")
-        print(f"  BDD:      {count_bdd:>2} states, {time_bdd_us:>8.0f} µs")
+        print(f"  Explicit: {count_explicit:>2} states, {time_explicit_us:>8} µs")
+        print(f"  BDD:      {count_bdd:>2} states, {time_bdd_us:>8} µs")
         print("  ✅ Counts match!" if count_explicit == count_bdd else "  ❌ MISMATCH!")
 
+        if args.draw:
+            # The two figures are independent and rendering is CPU-bound:
+            # draw them in parallel child processes, after the timed analyses
+            procs = [
+                Process(target=draw_petri_net, args=(net, "petri_net.png")),
+                Process(target=draw_reachability_graph,
+                        args=(labels, net.get_reachability_edges(), "reachability_graph.png")),
+            ]
+            for p in procs:
+                p.start()
+            for p in procs:
+                p.join()
+            if any(p.exitcode != 0 for p in procs):
+                raise RuntimeError("Drawing failed")
+
     except Exception as e:
         print(f"❌ Error: {e}", file=sys.stderr)
         import traceback
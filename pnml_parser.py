@@ -2,8 +2,31 @@
 ########### task 1 + 2 ##############################
 #####################################################
 import xml.etree.ElementTree as ET
-from typing import Set, List, Tuple, Dict, FrozenSet
+from typing import Any, Callable, Set, List, Tuple, Dict, FrozenSet, Iterator, Optional
 from collections import deque
+from functools import lru_cache
+from bfs_numba import bfs_reachable_masks
+from symmetry import canonical_mask, interchangeable_components
+from reach_cache import load_reachable, store_reachable
+
+
+@lru_cache(maxsize=32)
+def _step_function(masks: Tuple[Tuple[int, int], ...]) -> Callable[[int], List[int]]:
+    # Compile successors(m) for the given (pre, post) masks: one hard-coded
+    # guard and firing per transition, in order, so the BFS does no per-
+    # transition tuple unpacking or ~pre. Reused across nets with the same masks.
+    # The masks are bound as names in the function's globals rather than
+    # written out as literals: int -> decimal str is capped at 4300 digits,
+    # and wide nets would otherwise bloat the source
+    namespace: Dict[str, Any] = {}
+    rows = []
+    for i, (pre, post) in enumerate(masks):
+        namespace[f"pre{i}"], namespace[f"clear{i}"], namespace[f"post{i}"] = pre, ~pre, post
+        rows.append(f"    if m & pre{i} == pre{i}: out.append(m & clear{i} | post{i})")
+    src = "\n".join(["def successors(m):", "    out = []", *rows, "    return out"])
+    exec(compile(src, "<step-function>", "exec"), namespace)
+    return namespace["successors"]
+
 
 class PetriNet:
     def __init__(self):
@@ -14,6 +37,25 @@ class PetriNet:
         self.initial_marking: Set[str] = set()
         self.preset: Dict[str, Set[str]] = {}
         self.postset: Dict[str, Set[str]] = {}
+        # Bitset encoding of markings: place -> bit index, and per transition
+        # the mask of its input (pre) and output (post) places
+        self.place_index: Dict[str, int] = {}
+        self._place_by_bit: List[str] = []
+        self.pre_mask: Dict[str, int] = {}
+        self.post_mask: Dict[str, int] = {}
+        # (transition, pre_mask, post_mask) in sorted transition order, built
+        # on first use and cleared when transitions or arcs change
+        self._trans_tuples: Optional[List[Tuple[str, int, int]]] = None
+        # Last reachability result (bitsets and decoded markings, in BFS
+        # order), keyed by the initial marking it was computed from; cleared
+        # whenever the net structure changes
+        self._reach_cache: Optional[Tuple[FrozenSet[str], List[int], List[FrozenSet[str]]]] = None
+        # Interchangeable components as (group_mask, per-component place
+        # bits), built on first use and cleared whenever the net changes
+        self._symmetry: Optional[List[Tuple[int, List[List[int]]]]] = None
+        # Directory for the persistent reachability cache (reach_cache.py);
+        # None keeps everything in memory
+        self.cache_dir: Optional[str] = None
 
     def add_place(self, pid: str):
         if pid in self.places or pid in self.transitions:
@@ -21,6 +63,10 @@ class PetriNet:
         self.places.add(pid)
         self.preset[pid] = set()
         self.postset[pid] = set()
+        self.place_index[pid] = len(self.place_index)
+        self._place_by_bit.append(pid)
+        self._reach_cache = None
+        self._symmetry = None
 
     def add_transition(self, tid: str):
         if tid in self.transitions or tid in self.places:
@@ -28,6 +74,11 @@ class PetriNet:
         self.transitions.add(tid)
         self.preset[tid] = set()
         self.postset[tid] = set()
+        self.pre_mask[tid] = 0
+        self.post_mask[tid] = 0
+        self._trans_tuples = None
+        self._reach_cache = None
+        self._symmetry = None
 
     def add_arc(self, src: str, tgt: str):
         if src not in self.places and src not in self.transitions:
@@ -41,6 +92,13 @@ class PetriNet:
         self.arcs.append((src, tgt))
         self.postset[src].add(tgt)
         self.preset[tgt].add(src)
+        if src in self.places:
+            self.pre_mask[tgt] |= 1 << self.place_index[src]
+        else:
+            self.post_mask[src] |= 1 << self.place_index[tgt]
+        self._trans_tuples = None
+        self._reach_cache = None
+        self._symmetry = None
 
     def set_initial_marking(self, place_id: str, tokens: int):
         if tokens > 1:
@@ -54,30 +112,169 @@ class PetriNet:
     def fire(self, transition: str, marking: FrozenSet[str]) -> FrozenSet[str]:
         if not self.is_enabled(transition, marking):
             raise RuntimeError(f"Transition {transition} is not enabled!")
-        new_marking = (marking - self.preset[transition]) | self.postset[transition]
-        return frozenset(new_marking)
+        # frozenset(frozenset) is a no-op, and difference/union on a frozenset
+        # return a frozenset directly, with no intermediate sets
+        return frozenset(marking).difference(self.preset[transition]).union(self.postset[transition])
+
+    def marking_to_mask(self, marking: Set[str]) -> int:
+        mask = 0
+        for p in marking:
+            mask |= 1 << self.place_index[p]
+        return mask
+
+    def mask_to_marking(self, mask: int) -> FrozenSet[str]:
+        names = self._place_by_bit
+        marking = []
+        while mask:
+            low = mask & -mask
+            marking.append(names[low.bit_length() - 1])
+            mask ^= low
+        return frozenset(marking)
+
+    def transition_masks(self) -> List[Tuple[str, int, int]]:
+        if self._trans_tuples is None:
+            self._trans_tuples = [(t, self.pre_mask[t], self.post_mask[t]) for t in sorted(self.transitions)]
+        return self._trans_tuples
 
     def get_reachable_markings(self) -> List[FrozenSet[str]]:
         if not self.places:
             return []
+        return list(self._reachability()[1])
 
-        initial = frozenset(self.initial_marking)
+    def iter_reachable_markings(self) -> Iterator[FrozenSet[str]]:
+        # Streaming form of get_reachable_markings, in the same BFS order:
+        # markings are yielded as they are discovered, so a consumer that
+        # reduces or stops early never holds the whole list
+        if not self.places:
+            return
+        if self._reach_cache is not None and self._reach_cache[0] == frozenset(self.initial_marking):
+            yield from self._reach_cache[2]
+            return
+        for m in self._bfs_masks():
+            yield self.mask_to_marking(m)
+
+    def find_first_deadlock(self) -> Optional[FrozenSet[str]]:
+        # First reachable marking (in BFS order) with no enabled transition,
+        # or None if there is none. Scans the cached reachable set when it is
+        # valid; otherwise the BFS stops as soon as one is found instead of
+        # building the whole reachable set
+        if not self.places:
+            return None
+        pres = [pre for _, pre, _ in self.transition_masks()]
+        if self._reach_cache is not None and self._reach_cache[0] == frozenset(self.initial_marking):
+            masks = self._reach_cache[1]
+        else:
+            masks = self._bfs_masks()
+        for m in masks:
+            if not any(m & pre == pre for pre in pres):
+                return self.mask_to_marking(m)
+        return None
+
+    def get_reachability_edges(self) -> List[Tuple[int, str, int]]:
+        # Edges (i, t, j): firing t in the i-th marking of
+        # get_reachable_markings() yields the j-th one
+        if not self.places:
+            return []
+        reachable = self._reachability()[0]
+        index = {m: i for i, m in enumerate(reachable)}
+        masks = self.transition_masks()
+
+        edges = []
+        for i, m in enumerate(reachable):
+            for t, pre, post in masks:
+                if m & pre == pre:
+                    edges.append((i, t, index[(m & ~pre) | post]))
+        return edges
+
+    def canonical(self, marking: FrozenSet[str]) -> FrozenSet[str]:
+        # Representative of the marking's orbit under permutations of
+        # interchangeable components
+        return self.mask_to_marking(canonical_mask(self.marking_to_mask(marking), self._symmetry_groups()))
+
+    def get_reachable_representatives(self) -> List[FrozenSet[str]]:
+        # Symmetry-reduced BFS: one canonical marking per orbit of reachable
+        # markings. Automorphisms commute with firing, so exploring only
+        # canonical successors visits every orbit exactly once.
+        if not self.places:
+            return []
+        groups = self._symmetry_groups()
+        masks = [(pre, post) for _, pre, post in self.transition_masks()]
+
+        initial = canonical_mask(self.marking_to_mask(self.initial_marking), groups)
         visited = {initial}
         queue = deque([initial])
-        result = [initial]  # <-- giữ thứ tự
+        result = [initial]
 
         while queue:
             m = queue.popleft()
-            # Duyệt transitions theo thứ tự xác định (dùng sorted)
-            for t in sorted(self.transitions):  # <-- đảm bảo reproducible
-                if self.is_enabled(t, m):
-                    next_m = self.fire(t, m)
+            for pre, post in masks:
+                if m & pre == pre:
+                    next_m = canonical_mask((m & ~pre) | post, groups)
                     if next_m not in visited:
                         visited.add(next_m)
                         queue.append(next_m)
                         result.append(next_m)
 
-        return result
+        return [self.mask_to_marking(m) for m in result]
+
+    def _symmetry_groups(self) -> List[Tuple[int, List[List[int]]]]:
+        if self._symmetry is None:
+            self._symmetry = []
+            for components in interchangeable_components(self):
+                bits = [[1 << self.place_index[p] for p in places] for places in components]
+                self._symmetry.append((sum(sum(b) for b in bits), bits))
+        return self._symmetry
+
+    def _reachability(self) -> Tuple[List[int], List[FrozenSet[str]]]:
+        # initial_marking is a plain set that callers may reassign or mutate,
+        # so the cache is validated against it on every call
+        initial_key = frozenset(self.initial_marking)
+        if self._reach_cache is None or self._reach_cache[0] != initial_key:
+            markings = load_reachable(self.cache_dir, self) if self.cache_dir else None
+            if markings is not None:
+                reachable = [self.marking_to_mask(m) for m in markings]
+            else:
+                reachable = self._explore_reachable_masks()
+                markings = [self.mask_to_marking(m) for m in reachable]
+                if self.cache_dir:
+                    store_reachable(self.cache_dir, self, markings)
+            self._reach_cache = (initial_key, reachable, markings)
+        return self._reach_cache[1], self._reach_cache[2]
+
+    def _explore_reachable_masks(self) -> List[int]:
+        # Compiled kernel when Numba is available and the net fits in int64
+        masks = [(pre, post) for _, pre, post in self.transition_masks()]
+        result = bfs_reachable_masks(self.marking_to_mask(self.initial_marking), masks, len(self.places))
+        if result is not None:
+            return result
+        return list(self._bfs_masks())
+
+    def _bfs_masks(self) -> Iterator[int]:
+        # BFS over int bitsets: enabled iff (m & pre) == pre,
+        # firing gives (m & ~pre) | post. Each marking is yielded when first
+        # discovered. Transition order comes from transition_masks() (sorted
+        # ids), and the generated successors keeps it
+        successors = _step_function(tuple((pre, post) for _, pre, post in self.transition_masks()))
+
+        initial = self.marking_to_mask(self.initial_marking)
+        visited = {initial}
+        queue = deque([initial])
+        yield initial
+
+        # Bound methods as locals: the loop body does no attribute lookups
+        visited_update = visited.update
+        queue_pop = queue.popleft
+        queue_extend = queue.extend
+
+        while queue:
+            m = queue_pop()
+            # All successors of m at once, deduplicated in firing order; the
+            # visited/queue updates then loop in C rather than per item
+            new = [s for s in dict.fromkeys(successors(m)) if s not in visited]
+            if new:
+                visited_update(new)
+                queue_extend(new)
+                yield from new
 
     def __repr__(self):
         places = "{" + ", ".join(sorted(self.places)) + "}"
@@ -88,66 +285,93 @@ class PetriNet:
 
 
 def parse_pnml(file_path: str) -> PetriNet:
+    # Single streaming pass over the first <net>: namespaces are stripped as
+    # each element starts, places/transitions are added as they end, and
+    # processed elements are detached from their parent so memory does not
+    # grow with the net. Arcs are applied once the net is complete, since
+    # they may precede their endpoints. The rest of the document is still
+    # read, so malformed XML after the first net is rejected.
+    net = None
+    done = False
+    arcs: List[Tuple[str, str]] = []
+    # Open elements, innermost last; the parent of an ending element is the
+    # one below it
+    stack: List[ET.Element] = []
+
     try:
-        tree = ET.parse(file_path)
+        for event, elem in ET.iterparse(file_path, events=("start", "end")):
+            if event == "start":
+                elem.tag = elem.tag.rpartition("}")[2]
+                stack.append(elem)
+                if elem.tag == "net" and net is None:
+                    net = PetriNet()
+                    net.name = elem.get("id", "unnamed")
+                continue
+
+            stack.pop()
+            if net is None or done:
+                continue
+            tag = elem.tag
+
+            if tag == "place":
+                pid = elem.get("id")
+                if not pid:
+                    raise ValueError("Place missing ID")
+                net.add_place(pid)
+
+                mk = elem.find(".//initialMarking")
+                tokens = 0
+
+                if mk is not None:
+                    # Form 1: <value>1</value>
+                    val = mk.find("value")
+                    # Form 2: <token><value>1</value></token>
+                    if val is None:
+                        val = mk.find(".//token/value")
+                    # Form 3: <text>1</text>  ← ADD THIS
+                    if val is None:
+                        val = mk.find("text")
+
+                    if val is not None and val.text:
+                        try:
+                            tokens = int(val.text.strip())
+                        except:
+                            raise ValueError(f"Invalid marking at place {pid}")
+
+                net.set_initial_marking(pid, tokens)
+
+            elif tag == "transition":
+                tid = elem.get("id")
+                if not tid:
+                    raise ValueError("Transition missing ID")
+                net.add_transition(tid)
+
+            elif tag == "arc":
+                src = elem.get("source")
+                tgt = elem.get("target")
+                if not src or not tgt:
+                    raise ValueError("Arc missing source/target")
+                arcs.append((src, tgt))
+
+            elif tag == "net":
+                # Only the first net is read
+                done = True
+                continue
+
+            else:
+                continue
+
+            if stack:
+                stack[-1].remove(elem)
     except ET.ParseError as e:
         raise ValueError(f"Invalid XML: {e}")
 
-    root = tree.getroot()
-    for elem in root.iter():
-        if elem.tag.startswith("{"):
-            elem.tag = elem.tag.split("}", 1)[1]
-
-    net_elem = root.find(".//net")
-    if net_elem is None:
+    if net is None:
         raise ValueError("No <net> found")
 
-    net = PetriNet()
-    net.name = net_elem.get("id", "unnamed")
-
-    for p in net_elem.findall(".//place"):
-        pid = p.get("id")
-        if not pid:
-            raise ValueError("Place missing ID")
-        net.add_place(pid)
-
-    for t in net_elem.findall(".//transition"):
-        tid = t.get("id")
-        if not tid:
-            raise ValueError("Transition missing ID")
-        net.add_transition(tid)
-
-    for arc in net_elem.findall(".//arc"):
-        src = arc.get("source")
-        tgt = arc.get("target")
-        if not src or not tgt:
-            raise ValueError("Arc missing source/target")
+    for src, tgt in arcs:
         net.add_arc(src, tgt)
 
-    # ---------- PASS 4: INITIAL MARKINGS ----------
-    for p in net_elem.findall(".//place"):
-        pid = p.get("id")
-        mk = p.find(".//initialMarking")
-        tokens = 0
-
-        if mk is not None:
-            # Form 1: <value>1</value>
-            val = mk.find("value")
-            # Form 2: <token><value>1</value></token>
-            if val is None:
-                val = mk.find(".//token/value")
-            # Form 3: <text>1</text>  ← ADD THIS
-            if val is None:
-                val = mk.find("text")
-
-            if val is not None and val.text:
-                try:
-                    tokens = int(val.text.strip())
-                except:
-                    raise ValueError(f"Invalid marking at place {pid}")
-
-        net.set_initial_marking(pid, tokens)
-
     for t in net.transitions:
         if len(net.preset[t]) == 0:
             print(f"Warning: Transition {t} has no input places.")
@@ -0,0 +1,66 @@
+# reach_cache.py
+# Opt-in on-disk cache of reachable markings, so re-running on the same net
+# (same places, transitions, arcs and initial marking) skips the BFS.
+# Entries are JSON lists of sorted place-name lists in BFS order, one file
+# per net, named by a hash of the net's canonical description. JSON rather
+# than pickle, so a planted file in the cache directory cannot run code.
+# The cache never breaks a run: unreadable or unwritable entries only cost
+# a warning.
+import hashlib
+import json
+import os
+import tempfile
+from typing import FrozenSet, List, Optional
+
+# Bump when the stored format or the BFS order changes
+_FORMAT = 2
+
+
+def net_key(net) -> str:
+    # Sorted, so the key does not depend on the order nodes were added in
+    desc = repr((_FORMAT, sorted(net.places), sorted(net.transitions),
+                 sorted(net.arcs), sorted(net.initial_marking)))
+    return hashlib.blake2b(desc.encode(), digest_size=20).hexdigest()
+
+
+def _is_valid(entries, net) -> bool:
+    # A reachable set of this net: lists of its place names, starting from
+    # the initial marking
+    return (isinstance(entries, list) and bool(entries)
+            and all(isinstance(m, list) and all(isinstance(p, str) for p in m)
+                    and net.places.issuperset(m) for m in entries)
+            and frozenset(entries[0]) == frozenset(net.initial_marking))
+
+
+def load_reachable(cache_dir: str, net) -> Optional[List[FrozenSet[str]]]:
+    path = os.path.join(cache_dir, net_key(net) + ".json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # A damaged entry is only a miss; it is overwritten on store
+        print(f"Warning: ignoring unreadable cache entry {path}: {e}")
+        return None
+    if not _is_valid(entries, net):
+        print(f"Warning: ignoring invalid cache entry {path}")
+        return None
+    return [frozenset(m) for m in entries]
+
+
+def store_reachable(cache_dir: str, net, markings: List[FrozenSet[str]]):
+    path = os.path.join(cache_dir, net_key(net) + ".json")
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees a partial file
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump([sorted(m) for m in markings], f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except Exception as e:
+        print(f"Warning: could not write cache entry {path}: {e}")
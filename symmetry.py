@@ -0,0 +1,96 @@
+# symmetry.py
+# Symmetry reduction for the explicit state space: find connected components
+# of a net that are isomorphic to each other (e.g. the identical chains of
+# build_parallel_chains) so that markings differing only by a permutation of
+# those components can share one canonical representative.
+from typing import Dict, List, Sequence, Tuple
+
+
+def _components(net) -> List[List[str]]:
+    # Connected components of the net graph (places + transitions, via arcs)
+    parent = {v: v for v in net.places | net.transitions}
+
+    def find(v):
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        return v
+
+    for src, tgt in net.arcs:
+        parent[find(src)] = find(tgt)
+
+    groups: Dict[str, List[str]] = {}
+    for v in sorted(parent):
+        groups.setdefault(find(v), []).append(v)
+    return list(groups.values())
+
+
+def _colours(net) -> Dict[str, int]:
+    # Colour refinement (1-dimensional Weisfeiler-Lehman) over the whole net,
+    # so colours are comparable between components. Nodes that can be swapped
+    # by an automorphism always end up with the same colour.
+    nodes = sorted(net.places | net.transitions)
+
+    def relabel(sig):
+        ids = {s: i for i, s in enumerate(sorted(set(sig.values())))}
+        return {v: ids[sig[v]] for v in nodes}
+
+    colour = relabel({v: (v in net.places, len(net.preset[v]), len(net.postset[v])) for v in nodes})
+    for _ in range(len(nodes)):
+        refined = relabel({
+            v: (colour[v],
+                tuple(sorted(colour[u] for u in net.preset[v])),
+                tuple(sorted(colour[u] for u in net.postset[v])))
+            for v in nodes
+        })
+        # Refinement only ever splits classes: same count means stable
+        if len(set(refined.values())) == len(set(colour.values())):
+            break
+        colour = refined
+    return colour
+
+
+def _is_isomorphism(net, mapping: Dict[str, str]) -> bool:
+    return all({mapping[u] for u in net.postset[v]} == net.postset[w] for v, w in mapping.items())
+
+
+def interchangeable_components(net) -> List[List[List[str]]]:
+    """
+    Groups of pairwise isomorphic connected components, as lists of their
+    places. Within a group the j-th place of every component plays the same
+    role. Only groups with at least two components are returned.
+    """
+    colour = _colours(net)
+    by_signature: Dict[Tuple[int, ...], List[List[str]]] = {}
+    for comp in _components(net):
+        comp.sort(key=lambda v: (colour[v], v))
+        by_signature.setdefault(tuple(colour[v] for v in comp), []).append(comp)
+
+    groups = []
+    for comps in by_signature.values():
+        # Same colours only suggests isomorphism; each candidate alignment is
+        # verified, so a grouping is never unsound
+        while comps:
+            ref, members, rest = comps[0], [comps[0]], []
+            for comp in comps[1:]:
+                (members if _is_isomorphism(net, dict(zip(comp, ref))) else rest).append(comp)
+            if len(members) > 1:
+                groups.append([[v for v in comp if v in net.places] for comp in members])
+            comps = rest
+    return groups
+
+
+def canonical_mask(mask: int, groups: Sequence[Tuple[int, Sequence[Sequence[int]]]]) -> int:
+    """
+    Canonical representative of a bitset marking: within each group
+    (group_mask, per-component place bits), the components' local states
+    are sorted.
+    """
+    for group_mask, components in groups:
+        states = sorted(sum(1 << j for j, bit in enumerate(bits) if mask & bit) for bits in components)
+        mask &= ~group_mask
+        for bits, state in zip(components, states):
+            for j, bit in enumerate(bits):
+                if state >> j & 1:
+                    mask |= bit
+    return mask
@@ -6,6 +6,8 @@
 
 from pnml_parser import PetriNet
 from bdd import symbolic_reachability_bdd
+from reach_cache import load_reachable, store_reachable
+import tempfile
 import time
 
 
@@ -118,6 +120,24 @@ def build_parallel_chains(n: int):
     return pn
 
 
+def build_wide_net(width=15000, n=4):
+    """
+    width places, of which only the last n form a chain
+    P(width-n) -> ... -> P(width-1); the others stay unmarked.
+    Transition masks are then ints of ~width bits (> 4300 decimal digits)
+    Initial marking: P(width-n)
+    """
+    pn = PetriNet()
+    for i in range(width):
+        pn.add_place(f"P{i}")
+    for i in range(width - n, width - 1):
+        pn.add_transition(f"T{i}")
+        pn.add_arc(f"P{i}", f"T{i}")
+        pn.add_arc(f"T{i}", f"P{i+1}")
+    pn.initial_marking = {f"P{width - n}"}
+    return pn
+
+
 # ============================================================
 # 2. HELPERS
 # ============================================================
@@ -169,6 +189,70 @@ def test_case(pn: PetriNet, name: str):
     print(f"Explicit time = {t_exp:.6f} s")
     print(f"BDD time      = {t_bdd:.6f} s")
 
+    # --------------------
+    # Deadlock: the short-circuit search must find the first dead marking
+    # of the full BFS
+    # --------------------
+    if R_exp is not None:
+        dead = [m for m in R_exp if not any(pn.is_enabled(t, m) for t in pn.transitions)]
+        first = pn.find_first_deadlock()
+        if first == (dead[0] if dead else None):
+            print(f"✔ First deadlock = {sorted(first) if first is not None else None}")
+        else:
+            print("❌ LỖI: find_first_deadlock does not match explicit BFS!")
+
+    # --------------------
+    # Symmetry reduction: one representative per orbit of reachable markings
+    # --------------------
+    if R_exp is not None:
+        reps = pn.get_reachable_representatives()
+        if set(reps) == {pn.canonical(m) for m in R_exp}:
+            print(f"✔ Symmetry-reduced orbits = {len(reps)}")
+        else:
+            print("❌ LỖI: symmetry-reduced orbits do not match explicit BFS!")
+
+
+def test_wide_net():
+    # Wider than the Numba kernel: the pure-Python BFS runs on masks past
+    # the int -> decimal str limit (explicit only, BDD counting overflows)
+    print("\n====================================")
+    print("TEST: Wide net (15000 places)")
+    print("====================================")
+    pn = build_wide_net(15000)
+    # Deadlock search first, so it runs its own BFS rather than the cache
+    dead = pn.find_first_deadlock()
+    reachable = pn.get_reachable_markings()
+    expected = [frozenset({f"P{i}"}) for i in range(14996, 15000)]
+    ok = reachable == expected and dead == expected[-1]
+    if ok:
+        print(f"✔ Explicit reachable states = {len(reachable)}")
+    else:
+        print("❌ LỖI: wide net reachability is wrong!")
+    assert ok, "wide net reachability is wrong"
+
+
+def test_reach_cache():
+    # Disk cache round trip: same markings, same BFS order
+    print("\n====================================")
+    print("TEST: Reachability disk cache")
+    print("====================================")
+    pn = build_parallel_chains(4)
+    reachable = pn.get_reachable_markings()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        missing = load_reachable(cache_dir, pn)
+        store_reachable(cache_dir, pn, reachable)
+        loaded = load_reachable(cache_dir, pn)
+
+        cached = build_parallel_chains(4)
+        cached.cache_dir = cache_dir
+        from_net = cached.get_reachable_markings()
+    ok = missing is None and loaded == reachable and from_net == reachable
+    if ok:
+        print(f"✔ Cache round trip = {len(loaded)} markings")
+    else:
+        print("❌ LỖI: cached markings differ from explicit BFS!")
+    assert ok, "cached markings differ from explicit BFS"
+
 
 # ============================================================
 # 4. RUN ALL TESTS
@@ -191,6 +275,9 @@ def run_all_tests():
     for name, pn in tests:
         test_case(pn, name)
 
+    test_wide_net()
+    test_reach_cache()
+
 
 if __name__ == "__main__":
     run_all_tests()